@@ -1,184 +1,11 @@
 import streamlit as st
-import cv2
 import json
 import pandas as pd
-from datetime import datetime
 from pathlib import Path
 import tempfile
-from ultralytics import solutions
-
-# Mapeo de clases COCO
-CLASS_NAMES = {
-    0: "person",
-    1: "bicycle",
-    2: "car",
-    3: "motorcycle",
-    5: "bus",
-    7: "truck"
-}
-
-CLASSES_TO_DETECT = [0, 1, 2, 3, 5, 7]
-
-def process_video(
-    video_path,
-    orientation="vertical",
-    resize_factor=0.5,
-    rect_width=20,
-    progress_bar=None,
-    status_text=None
-):
-    """
-    Procesa el video con detección y conteo de objetos
-    """
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
-        raise Exception("Error al leer el archivo de video")
-
-    w, h, fps = (int(cap.get(x)) for x in (
-        cv2.CAP_PROP_FRAME_WIDTH,
-        cv2.CAP_PROP_FRAME_HEIGHT,
-        cv2.CAP_PROP_FPS
-    ))
-
-    proc_w = int(w * resize_factor)
-    proc_h = int(h * resize_factor)
-
-    # Configurar región según orientación
-    if orientation == "vertical":
-        center_x = int(proc_w / 2)
-        region_points = [
-            (center_x - rect_width, 0),
-            (center_x + rect_width, 0),
-            (center_x + rect_width, proc_h),
-            (center_x - rect_width, proc_h)
-        ]
-    else:  # horizontal
-        center_y = int(proc_h / 2)
-        region_points = [
-            (0, center_y - rect_width),
-            (proc_w, center_y - rect_width),
-            (proc_w, center_y + rect_width),
-            (0, center_y + rect_width)
-        ]
-
-    # Crear archivo temporal para salida
-    output_file = tempfile.NamedTemporaryFile(delete=False, suffix='.mp4')
-    output_path = output_file.name
-    output_file.close()
-
-    # Configurar video writer
-    try:
-        video_writer = cv2.VideoWriter(
-            output_path,
-            cv2.VideoWriter_fourcc(*"avc1"),
-            fps,
-            (proc_w, proc_h)
-        )
-        if not video_writer.isOpened():
-            raise Exception("H.264 no disponible")
-    except:
-        video_writer = cv2.VideoWriter(
-            output_path,
-            cv2.VideoWriter_fourcc(*"mp4v"),
-            fps,
-            (proc_w, proc_h)
-        )
-
-    # Inicializar contador
-    counter = solutions.ObjectCounter(
-        show=False,
-        region=region_points,
-        model="yolo11n.pt",
-        classes=CLASSES_TO_DETECT,
-        tracker="botsort.yaml",
-        show_in=True,
-        show_out=True,
-        line_width=2
-    )
-
-    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-    frame_num = 0
-    last_results = None
-
-    while cap.isOpened():
-        success, im0 = cap.read()
-        if not success:
-            break
-
-        frame_num += 1
-
-        # Actualizar progreso
-        if progress_bar and frame_num % 10 == 0:
-            progress = frame_num / total_frames
-            progress_bar.progress(progress)
-            if status_text:
-                status_text.text(f"Procesando: {frame_num}/{total_frames} frames ({progress*100:.1f}%)")
-
-        # Procesar frame
-        resized_frame = cv2.resize(im0, (proc_w, proc_h))
-        results = counter(resized_frame)
-        last_results = results
-
-        video_writer.write(results.plot_im)
-
-    cap.release()
-    video_writer.release()
-
-    # Extraer conteos por clase
-    conteo_por_clase = {}
-
-    if last_results and hasattr(last_results, 'classwise_count') and last_results.classwise_count:
-        for class_id, counts in last_results.classwise_count.items():
-            try:
-                numeric_id = int(class_id)
-                class_name = CLASS_NAMES.get(numeric_id, f"clase_{class_id}")
-            except (ValueError, TypeError):
-                class_name = str(class_id).lower()
-
-            if isinstance(counts, dict):
-                in_count = counts.get('IN', counts.get('in', 0))
-                out_count = counts.get('OUT', counts.get('out', 0))
-                conteo_por_clase[class_name] = {
-                    'in': int(in_count),
-                    'out': int(out_count),
-                    'total': int(in_count) + int(out_count)
-                }
-
-    elif hasattr(counter, 'classwise_count') and counter.classwise_count:
-        for class_id, counts in counter.classwise_count.items():
-            try:
-                numeric_id = int(class_id)
-                class_name = CLASS_NAMES.get(numeric_id, f"clase_{class_id}")
-            except (ValueError, TypeError):
-                class_name = str(class_id).lower()
-
-            if isinstance(counts, dict):
-                in_count = counts.get('IN', counts.get('in', 0))
-                out_count = counts.get('OUT', counts.get('out', 0))
-                conteo_por_clase[class_name] = {
-                    'in': int(in_count),
-                    'out': int(out_count),
-                    'total': int(in_count) + int(out_count)
-                }
-
-    # Preparar resultados
-    results_data = {
-        "processing_id": datetime.now().strftime("%Y%m%d_%H%M%S"),
-        "fecha_procesamiento": datetime.now().isoformat(),
-        "conteo_total": {
-            "in_count": counter.in_count if hasattr(counter, 'in_count') else 0,
-            "out_count": counter.out_count if hasattr(counter, 'out_count') else 0,
-            "total": (counter.in_count + counter.out_count) if hasattr(counter, 'in_count') and hasattr(counter, 'out_count') else 0
-        },
-        "conteo_por_clase": conteo_por_clase,
-        "configuracion": {
-            "orientacion": orientation,
-            "resize_factor": resize_factor,
-            "rect_width": rect_width
-        }
-    }
 
-    return output_path, results_data
+from processing import process_video
+from track_cache import open_track_cache
 
 
 def main():
@@ -272,6 +99,12 @@ def main():
         format_func=lambda x: f"{x}%"
     ) / 100
 
+    use_track_cache = st.sidebar.checkbox(
+        "Reutilizar tracks en caché",
+        value=True,
+        help="Si el video ya fue procesado con la misma resolución, el conteo se recalcula con la nueva región en segundos (sin generar video)"
+    )
+
     # Botón de procesamiento
     if uploaded_file is not None:
         # Mostrar información del video
@@ -296,6 +129,11 @@ def main():
                 progress_bar = st.progress(0)
                 status_text = st.empty()
 
+            # La caché es opcional: si no se puede abrir se procesa sin ella
+            track_cache = open_track_cache() if use_track_cache else None
+            if use_track_cache and track_cache is None:
+                st.warning("No se pudo abrir la caché de tracks; se procesará sin caché")
+
             try:
                 # Procesar video
                 output_path, results = process_video(
@@ -304,7 +142,8 @@ def main():
                     resize_factor=resize_factor,
                     rect_width=rect_width,
                     progress_bar=progress_bar,
-                    status_text=status_text
+                    status_text=status_text,
+                    track_cache=track_cache
                 )
 
                 progress_bar.progress(100)
@@ -318,10 +157,14 @@ def main():
 
                 with tab1:
                     st.markdown("### Video con Detecciones")
-                    # Mostrar video
-                    with open(output_path, 'rb') as video_file:
-                        video_bytes = video_file.read()
-                        st.video(video_bytes)
+                    # Mostrar video (no se genera al recontar desde la caché)
+                    video_bytes = None
+                    if output_path:
+                        with open(output_path, 'rb') as video_file:
+                            video_bytes = video_file.read()
+                            st.video(video_bytes)
+                    else:
+                        st.info("Conteo recalculado desde la caché de tracks. Desactiva la caché para regenerar el video.")
 
                 with tab2:
                     # Métricas principales en tarjetas
@@ -390,13 +233,16 @@ def main():
 
                     with col1:
                         st.markdown("#### Video Procesado")
-                        st.download_button(
-                            label="Descargar Video MP4",
-                            data=video_bytes,
-                            file_name=f"processed_{uploaded_file.name}",
-                            mime="video/mp4",
-                            use_container_width=True
-                        )
+                        if video_bytes:
+                            st.download_button(
+                                label="Descargar Video MP4",
+                                data=video_bytes,
+                                file_name=f"processed_{uploaded_file.name}",
+                                mime="video/mp4",
+                                use_container_width=True
+                            )
+                        else:
+                            st.caption("Video no disponible (resultado desde caché)")
 
                     with col2:
                         st.markdown("#### Datos en JSON")
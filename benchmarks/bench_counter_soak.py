@@ -0,0 +1,145 @@
+"""
+Benchmark de resistencia (soak) del estado de conteo.
+
+Alimenta millones de frames sintéticos (objetos que cruzan la región de forma
+continua, con IDs siempre nuevos como en un tracker real) a ``RegionCounter``
+y reporta por ventana el tiempo medio por frame, el tamaño del estado y el
+RSS. Con ``--legacy N`` corre además N frames con el estado original de
+ObjectCounter (lista de IDs contados, historial sin expiración) para comparar.
+
+Uso:
+    python benchmarks/bench_counter_soak.py
+    python benchmarks/bench_counter_soak.py --frames 5000000 --legacy 200000
+"""
+import argparse
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_frame_path import current_rss  # noqa: E402
+from region_counting import RegionCounter, build_region  # noqa: E402
+
+NAMES = {0: "person", 1: "bicycle", 2: "car", 3: "motorcycle", 5: "bus", 7: "truck"}
+
+
+class LegacyState:
+    """Estado equivalente al de ObjectCounter: lista de IDs y historial sin expiración."""
+
+    def __init__(self):
+        self.history = defaultdict(list)
+        self.counted_ids = []
+        self.in_count = 0
+        self.out_count = 0
+        self.classwise_count = defaultdict(lambda: {"IN": 0, "OUT": 0})
+
+    def next_frame(self, frame_idx=None):
+        pass
+
+    def observe(self, track_id, centroid):
+        track_line = self.history[track_id]
+        track_line.append(centroid)
+        if len(track_line) > 30:
+            track_line.pop(0)
+        return track_line
+
+    def record(self, track_id, class_name, direction):
+        if direction == "IN":
+            self.in_count += 1
+        else:
+            self.out_count += 1
+        self.classwise_count[class_name][direction] += 1
+        self.counted_ids.append(track_id)
+
+
+class SyntheticStream:
+    """Objetos concurrentes que cruzan el frame; al salir reaparecen con un ID nuevo."""
+
+    def __init__(self, width, height, concurrent, lifetime, seed=0):
+        self.width, self.height, self.lifetime = width, height, lifetime
+        self.rng = np.random.default_rng(seed)
+        self.classes = np.array(list(NAMES))
+        self.ids = np.arange(1, concurrent + 1)
+        self.next_id = concurrent + 1
+        self.start = -self.rng.integers(0, lifetime, concurrent)
+        self.direction = self.rng.random(concurrent) < 0.5
+        self.cls = self.rng.choice(self.classes, concurrent)
+        self.lane = self.rng.uniform(0, height - 40, concurrent)
+
+    def frame(self, frame_idx):
+        age = frame_idx - self.start
+        expired = age >= self.lifetime
+        if expired.any():
+            n = int(expired.sum())
+            self.ids[expired] = np.arange(self.next_id, self.next_id + n)
+            self.next_id += n
+            self.start[expired] = frame_idx
+            self.direction[expired] = self.rng.random(n) < 0.5
+            self.cls[expired] = self.rng.choice(self.classes, n)
+            self.lane[expired] = self.rng.uniform(0, self.height - 40, n)
+            age = frame_idx - self.start
+
+        x = (self.width - 60) * age / (self.lifetime - 1)
+        x = np.where(self.direction, x, self.width - 60 - x)
+        boxes = np.stack([x, self.lane, x + 60, self.lane + 40], axis=1).astype(np.float32)
+        return self.ids.tolist(), self.cls.tolist(), boxes
+
+
+def soak(counter, frames, window, stream):
+    print(f"{'frames':>10} {'us/frame':>10} {'tracks':>8} {'contados':>9} {'RSS MB':>8} {'IN+OUT':>9}")
+    rows = []
+    start = time.perf_counter()
+    for frame_idx in range(frames):
+        track_ids, classes, boxes = stream.frame(frame_idx)
+        counter.update(track_ids, classes, boxes, frame_idx)
+
+        if (frame_idx + 1) % window == 0:
+            elapsed = time.perf_counter() - start
+            state = counter.state
+            row = (frame_idx + 1, elapsed / window * 1e6, len(state.history),
+                   len(state.counted_ids), current_rss() / 2**20, state.in_count + state.out_count)
+            print(f"{row[0]:>10} {row[1]:>10.1f} {row[2]:>8} {row[3]:>9} {row[4]:>8.1f} {row[5]:>9}")
+            rows.append(row)
+            start = time.perf_counter()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=2_000_000, help="Frames sintéticos a procesar")
+    parser.add_argument("--window", type=int, default=100_000, help="Frames por fila del reporte")
+    parser.add_argument("--concurrent", type=int, default=12, help="Objetos simultáneos en escena")
+    parser.add_argument("--lifetime", type=int, default=90, help="Frames que tarda un objeto en cruzar")
+    parser.add_argument("--max-age", type=int, default=300, help="Frames sin ver un track antes de expirarlo")
+    parser.add_argument("--legacy", type=int, default=0, metavar="N",
+                        help="Frames a correr también con el estado original de ObjectCounter")
+    args = parser.parse_args()
+
+    width, height = 960, 540
+    region = build_region("vertical", 20, width, height)
+
+    print(f"🔁 Estado acotado (max_age={args.max_age}), {args.frames} frames")
+    counter = RegionCounter(region, NAMES, max_age=args.max_age)
+    rows = soak(counter, args.frames, args.window,
+                SyntheticStream(width, height, args.concurrent, args.lifetime))
+
+    if len(rows) > 1:
+        first, last = rows[0], rows[-1]
+        print(f"\n📈 Tiempo por frame: {first[1]:.1f} -> {last[1]:.1f} us | "
+              f"RSS: {first[4]:.1f} -> {last[4]:.1f} MB | tracks en estado: {first[2]} -> {last[2]}")
+
+    if args.legacy:
+        print(f"\n🐢 Estado original de ObjectCounter, {args.legacy} frames")
+        legacy = RegionCounter(region, NAMES)
+        legacy.state = LegacyState()
+        legacy.bounds = None  # ObjectCounter evalúa la región con shapely
+        soak(legacy, args.legacy, min(args.window, max(args.legacy // 10, 1)),
+             SyntheticStream(width, height, args.concurrent, args.lifetime))
+
+
+if __name__ == "__main__":
+    main()
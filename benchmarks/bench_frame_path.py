@@ -0,0 +1,153 @@
+"""
+Benchmark de memoria del camino por frame.
+
+Compara el ciclo original (``cap.read()`` + ``cv2.resize`` con arreglos nuevos
+en cada frame) contra ``FrameBuffers`` (buffers preasignados). Por frame mide
+los bytes reservados (tracemalloc, que incluye los datos de numpy) y el RSS del
+proceso. Sin ``--model`` las anotaciones se simulan con OpenCV; con ``--model``
+se usa el ObjectCounter real.
+
+Uso:
+    python benchmarks/bench_frame_path.py
+    python benchmarks/bench_frame_path.py --video mi_video.mp4 --frames 2000
+    python benchmarks/bench_frame_path.py --model yolo11n.pt
+"""
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from frame_buffers import FrameBuffers  # noqa: E402
+
+
+def current_rss():
+    """RSS actual del proceso en bytes (pico si /proc no está disponible)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if sys.platform == "darwin" else rss * 1024
+
+
+def make_synthetic_video(path, width, height, frames, fps=30):
+    """Genera un video con un rectángulo que cruza la escena."""
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    for i in range(frames):
+        frame[:] = (i % 255, 80, 160)
+        x = int((i / frames) * (width - 100))
+        cv2.rectangle(frame, (x, height // 3), (x + 100, height // 3 + 80), (255, 255, 255), -1)
+        writer.write(frame)
+    writer.release()
+
+
+def annotate(frame, counter):
+    """Anota el frame y devuelve la imagen que se escribiría al video."""
+    if counter is not None:
+        return counter(frame).plot_im
+    h, w = frame.shape[:2]
+    cv2.rectangle(frame, (w // 2 - 20, 0), (w // 2 + 20, h), (104, 0, 123), 4)
+    cv2.putText(frame, "IN 0 OUT 0", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+    return frame
+
+
+def run(mode, video_path, resize_factor, max_frames, warmup, counter):
+    cap = cv2.VideoCapture(str(video_path))
+    assert cap.isOpened(), f"No se pudo abrir {video_path}"
+    w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    proc_w, proc_h = int(w * resize_factor), int(h * resize_factor)
+    buffers = FrameBuffers(w, h, proc_w, proc_h) if mode == "buffered" else None
+
+    allocs = []
+    rss = []
+    tracemalloc.start()
+    start = time.perf_counter()
+    frame_num = 0
+    while frame_num < max_frames:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+
+        if buffers is not None:
+            frame = buffers.read(cap)
+            if frame is None:
+                break
+        else:
+            success, im0 = cap.read()
+            if not success:
+                break
+            frame = cv2.resize(im0, (proc_w, proc_h))
+
+        plot_im = annotate(frame, counter)
+        assert plot_im.shape[:2] == (proc_h, proc_w)
+
+        _, peak = tracemalloc.get_traced_memory()
+        allocs.append(peak - before)
+        rss.append(current_rss())
+        frame_num += 1
+        del frame, plot_im
+    elapsed = time.perf_counter() - start
+    tracemalloc.stop()
+    cap.release()
+
+    steady = slice(min(warmup, max(len(rss) - 1, 0)), None)
+    rss_steady = rss[steady]
+    slope = (rss_steady[-1] - rss_steady[0]) / max(len(rss_steady) - 1, 1) if rss_steady else 0.0
+    return {
+        "mode": mode,
+        "frames": frame_num,
+        "fps": frame_num / elapsed if elapsed else 0.0,
+        "alloc_per_frame": float(np.mean(allocs[steady])) if allocs else 0.0,
+        "rss_start": rss_steady[0] if rss_steady else 0,
+        "rss_end": rss_steady[-1] if rss_steady else 0,
+        "rss_slope": slope,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--video", help="Video de entrada (por defecto se genera uno sintético)")
+    parser.add_argument("--frames", type=int, default=600, help="Frames a procesar")
+    parser.add_argument("--width", type=int, default=1920, help="Ancho del video sintético")
+    parser.add_argument("--height", type=int, default=1080, help="Alto del video sintético")
+    parser.add_argument("--resize-factor", type=float, default=0.5)
+    parser.add_argument("--warmup", type=int, default=30, help="Frames ignorados al inicio")
+    parser.add_argument("--model", help="Modelo YOLO para usar el ObjectCounter real")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        video_path = args.video
+        if video_path is None:
+            video_path = Path(tmp) / "synthetic.mp4"
+            make_synthetic_video(video_path, args.width, args.height, args.frames)
+
+        rows = []
+        for mode in ("original", "buffered"):
+            counter = None
+            if args.model:
+                from ultralytics import solutions
+
+                counter = solutions.ObjectCounter(show=False, model=args.model, tracker="botsort.yaml", verbose=False)
+            rows.append(run(mode, video_path, args.resize_factor, args.frames, args.warmup, counter))
+
+    print(f"{'modo':<10} {'frames':>7} {'fps':>8} {'alloc/frame':>14} {'RSS final':>12} {'RSS/frame':>12}")
+    for r in rows:
+        print(
+            f"{r['mode']:<10} {r['frames']:>7} {r['fps']:>8.1f} "
+            f"{r['alloc_per_frame'] / 1024:>11.1f} KB {r['rss_end'] / 2**20:>9.1f} MB "
+            f"{r['rss_slope'] / 1024:>9.2f} KB"
+        )
+
+
+if __name__ == "__main__":
+    main()
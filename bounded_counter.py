@@ -0,0 +1,67 @@
+from ultralytics import solutions
+from ultralytics.utils import YAML
+from ultralytics.utils.checks import check_yaml
+
+from region_counting import RegionCounter
+
+
+def tracker_track_buffer(tracker):
+    """
+    Frames que el tracker conserva un track perdido antes de descartarlo
+    (``track_buffer`` de su YAML)
+    """
+    return int(YAML.load(check_yaml(tracker)).get("track_buffer", 30))
+
+
+def check_max_age(max_age, tracker):
+    """
+    Valida que ``max_age`` no sea menor que el ``track_buffer`` del tracker.
+    Si lo fuera, un track ya contado que reaparece tras una oclusión (con el
+    mismo ID) se habría expirado del estado y se contaría dos veces.
+    """
+    track_buffer = tracker_track_buffer(tracker)
+    if max_age < track_buffer:
+        raise ValueError(
+            f"max_age ({max_age}) no puede ser menor que el track_buffer de {tracker} ({track_buffer})"
+        )
+    return max_age
+
+
+class BoundedObjectCounter(solutions.ObjectCounter):
+    """
+    ObjectCounter con estado acotado (ver ``CounterState``): historial de
+    largo fijo por track, IDs contados en un set y expiración de tracks que no
+    aparecen durante ``max_age`` frames. El dibujo y la salida son los mismos
+    de ultralytics; solo cambia dónde se guarda el estado del conteo.
+    """
+
+    def __init__(self, history_len=30, max_age=300, **kwargs):
+        super().__init__(**kwargs)
+        self.history_len = history_len
+        self.max_age = check_max_age(max_age, self.CFG["tracker"])
+        self.region_counter = None
+
+    def initialize_region(self):
+        super().initialize_region()
+        self.region_counter = RegionCounter(self.region, self.names, self.history_len, self.max_age)
+        state = self.region_counter.state
+        self.track_history = state.history
+        self.counted_ids = state.counted_ids
+        self.classwise_count = state.classwise_count
+
+    def extract_tracks(self, im0):
+        super().extract_tracks(im0)
+        self.region_counter.state.next_frame()
+
+    def store_tracking_history(self, track_id, box):
+        if box.numel() > 4:
+            # OBB: 4 vértices (4, 2), mismo centroide que la implementación base
+            centroid = tuple(float(v) for v in box.mean(dim=0))
+        else:
+            centroid = (float(box[0] + box[2]) / 2, float(box[1] + box[3]) / 2)
+        self.track_line = self.region_counter.state.observe(track_id, centroid)
+
+    def count_objects(self, current_centroid, track_id, prev_position, cls):
+        self.region_counter.count_crossing(track_id, cls, current_centroid, prev_position)
+        self.in_count = self.region_counter.in_count
+        self.out_count = self.region_counter.out_count
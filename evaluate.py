@@ -0,0 +1,330 @@
+"""
+Evaluación de precisión de conteo vs. rendimiento.
+
+Ejecuta una grilla de configuraciones (modelo, resize_factor, tracker) con
+``process_video`` sobre clips con conteos IN/OUT reales por clase y reporta,
+por configuración, el error de conteo por clase junto a los fps y la memoria
+pico. Las configuraciones Pareto-óptimas (menor error, más fps, menos memoria)
+se marcan en la tabla.
+
+Archivo de anotaciones (JSON, rutas relativas al propio archivo):
+    {
+      "clips": [
+        {
+          "video": "cruce_01.mp4",
+          "orientation": "vertical",
+          "rect_width": 20,
+          "counts": {"car": {"in": 3, "out": 1}, "person": {"in": 2, "out": 0}}
+        }
+      ]
+    }
+
+Uso:
+    python evaluate.py anotaciones.json --model yolo11n.pt yolo11s.pt --resize 0.25 0.5 --tracker botsort.yaml bytetrack.yaml
+    python evaluate.py --synthetic 3 --resize 0.25 0.5 1.0
+"""
+import argparse
+import itertools
+import json
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pandas as pd
+
+from bounded_counter import check_max_age
+from processing import CLASS_NAMES, CLASSES_TO_DETECT, TRACK_ARGS, process_video
+from track_cache import TrackCache, TrackRecording, open_track_cache
+
+
+def load_annotations(path):
+    """
+    Lee el archivo de anotaciones y resuelve las rutas de video
+    """
+    path = Path(path)
+    with open(path) as f:
+        data = json.load(f)
+
+    clips = []
+    for clip in data["clips"]:
+        video = Path(clip["video"])
+        if not video.is_absolute():
+            video = path.parent / video
+        clips.append({
+            "video": str(video),
+            "orientation": clip.get("orientation", "vertical"),
+            "rect_width": clip.get("rect_width", 20),
+            "counts": {
+                clase: {"in": int(c.get("in", 0)), "out": int(c.get("out", 0))}
+                for clase, c in clip["counts"].items()
+            }
+        })
+    return clips
+
+
+def _run_clip(clip, model, resize_factor, tracker, cache_dir, max_age=300):
+    """
+    Ejecuta process_video sobre un clip. Corre en un proceso propio para que
+    la memoria pico medida corresponda solo a esta configuración. Los fps
+    salen de ``results["rendimiento"]`` (ver ``process_video``).
+    """
+    output_path, results = process_video(
+        clip["video"],
+        orientation=clip["orientation"],
+        resize_factor=resize_factor,
+        rect_width=clip["rect_width"],
+        model=model,
+        tracker=tracker,
+        track_cache=open_track_cache(cache_dir) if cache_dir else None,
+        max_age=max_age
+    )
+
+    if output_path:
+        Path(output_path).unlink(missing_ok=True)
+
+    return results, _peak_rss()
+
+
+def _peak_rss():
+    """Memoria residente pico del proceso en bytes (None si no se puede medir)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def count_errors(clips, all_results):
+    """
+    Error absoluto por clase (IN + OUT), sumado sobre todos los clips
+    """
+    errors = {}
+    for clip, results in zip(clips, all_results):
+        predicted = results["conteo_por_clase"]
+        for clase in set(clip["counts"]) | set(predicted):
+            truth = clip["counts"].get(clase, {"in": 0, "out": 0})
+            pred = predicted.get(clase, {"in": 0, "out": 0})
+            error = abs(pred["in"] - truth["in"]) + abs(pred["out"] - truth["out"])
+            errors[clase] = errors.get(clase, 0) + error
+    return errors
+
+
+def pareto_front(rows):
+    """
+    Marca las filas no dominadas: menor error, mayores fps y menor memoria.
+    Las métricas sin valor (None) en alguna fila no participan.
+    """
+    objectives = [
+        (key, sign) for key, sign in (("error_total", 1), ("fps", -1), ("memoria_pico_mb", 1))
+        if all(row[key] is not None for row in rows)
+    ]
+
+    def dominates(a, b):
+        not_worse = all(sign * a[key] <= sign * b[key] for key, sign in objectives)
+        better = any(sign * a[key] < sign * b[key] for key, sign in objectives)
+        return not_worse and better
+
+    return [not any(dominates(other, row) for other in rows if other is not row) for row in rows]
+
+
+def evaluate(clips, models, resize_factors, trackers, cache_dir=None, max_age=300):
+    """
+    Corre la grilla de configuraciones y devuelve un DataFrame con una fila por configuración.
+    Los clips servidos desde la caché de tracks no detectan, así que quedan
+    fuera de los fps y la memoria; si ningún clip se midió, ambos quedan en None.
+    """
+    rows = []
+    truth_total = sum(c["in"] + c["out"] for clip in clips for c in clip["counts"].values())
+
+    for model, resize_factor, tracker in itertools.product(models, resize_factors, trackers):
+        print(f"⚙️ {model} | resize {resize_factor} | {tracker}")
+
+        all_results, total_frames, total_time, peaks = [], 0, 0.0, []
+        for clip in clips:
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+                results, peak = executor.submit(
+                    _run_clip, clip, model, resize_factor, tracker, cache_dir, max_age
+                ).result()
+            all_results.append(results)
+            if results["configuracion"].get("desde_cache"):
+                continue
+            total_frames += results["rendimiento"]["frames_medidos"]
+            total_time += results["rendimiento"]["tiempo_s"]
+            peaks.append(peak)
+
+        errors = count_errors(clips, all_results)
+        error_total = sum(errors.values())
+        row = {
+            "modelo": model,
+            "resize_factor": resize_factor,
+            "tracker": tracker,
+            "error_total": error_total,
+            "error_relativo": error_total / truth_total if truth_total else 0.0,
+            "fps": total_frames / total_time if total_time else None,
+            "memoria_pico_mb": max(peaks) / 2**20 if peaks and None not in peaks else None,
+            "clips_medidos": len(peaks),
+            "desde_cache": any(r["configuracion"].get("desde_cache") for r in all_results)
+        }
+        row.update({f"error_{clase}": e for clase, e in sorted(errors.items())})
+        rows.append(row)
+
+    for row, optimal in zip(rows, pareto_front(rows)):
+        row["pareto"] = optimal
+
+    return pd.DataFrame(rows)
+
+
+def make_synthetic_fixture(output_dir, num_clips, width=640, height=360, fps=30, frames=150):
+    """
+    Genera clips sintéticos (rectángulos que cruzan el frame) con cruces
+    conocidos y su archivo de anotaciones. Devuelve la ruta de las anotaciones
+    y, por video, la grabación de los tracks reales a resolución completa.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(0)
+    box_w, box_h, duration = 60, 40, 60
+
+    clips, recordings = [], {}
+    for clip_idx in range(num_clips):
+        # Objetos: (id, clase, dirección, frame inicial, carril)
+        num_objects = int(rng.integers(3, 8))
+        objects = []
+        for obj_idx in range(num_objects):
+            objects.append((
+                obj_idx + 1,
+                int(rng.choice(CLASSES_TO_DETECT)),
+                "in" if rng.random() < 0.5 else "out",
+                int(rng.integers(0, frames - duration)),
+                (obj_idx % max(1, height // box_h - 1)) * box_h + box_h // 2
+            ))
+
+        video_path = output_dir / f"synthetic_{clip_idx:02d}.mp4"
+        writer = cv2.VideoWriter(str(video_path), cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+        recording = TrackRecording(CLASS_NAMES, (width, height))
+        frame = np.empty((height, width, 3), dtype=np.uint8)
+        for frame_idx in range(frames):
+            frame[:] = 40
+            track_ids, classes, boxes = [], [], []
+            for track_id, cls, direction, start, lane in objects:
+                t = frame_idx - start
+                if not 0 <= t < duration:
+                    continue
+                x = (width - box_w) * t / (duration - 1)
+                if direction == "out":
+                    x = width - box_w - x
+                cv2.rectangle(frame, (int(x), lane), (int(x) + box_w, lane + box_h), (255, 255, 255), -1)
+                track_ids.append(track_id)
+                classes.append(cls)
+                boxes.append((x, lane, x + box_w, lane + box_h))
+            writer.write(frame)
+            recording.add(frame_idx, track_ids, classes, boxes)
+        writer.release()
+        recordings[video_path.name] = recording
+
+        counts = {}
+        for _, cls, direction, _, _ in objects:
+            clase = counts.setdefault(CLASS_NAMES[cls], {"in": 0, "out": 0})
+            clase[direction] += 1
+
+        clips.append({
+            "video": video_path.name,
+            "orientation": "vertical",
+            "rect_width": 20,
+            "counts": counts
+        })
+
+    annotations_path = output_dir / "anotaciones.json"
+    with open(annotations_path, 'w') as f:
+        json.dump({"clips": clips}, f, indent=2)
+
+    return annotations_path, recordings
+
+
+def check_synthetic_fixture(annotations_path, recordings, cache_dir,
+                            model="yolo11n.yaml", tracker="botsort.yaml"):
+    """
+    Autocontrol del arnés: siembra los tracks reales en una caché y corre
+    ``process_video`` sobre cada clip, que los recuenta sin detectar. Con los
+    tracks reales el error tiene que ser 0; devuelve el error total.
+    """
+    cache = TrackCache(cache_dir)
+    clips = load_annotations(annotations_path)
+
+    all_results = []
+    for clip in clips:
+        key = cache.key(clip["video"], model, 1.0, tracker, CLASSES_TO_DETECT, TRACK_ARGS)
+        cache.put(key, recordings[Path(clip["video"]).name])
+        _, results = process_video(
+            clip["video"],
+            orientation=clip["orientation"],
+            resize_factor=1.0,
+            rect_width=clip["rect_width"],
+            model=model,
+            tracker=tracker,
+            track_cache=cache
+        )
+        if not results["configuracion"].get("desde_cache"):
+            raise Exception(f"Autocontrol sintético: {clip['video']} no se leyó desde la caché")
+        all_results.append(results)
+
+    return sum(count_errors(clips, all_results).values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("annotations", nargs="?", help="Archivo JSON con los conteos reales por clip")
+    parser.add_argument("--model", nargs="+",
+                        help="Modelos a evaluar (por defecto yolo11n.pt; yolo11n.yaml con --synthetic)")
+    parser.add_argument("--resize", type=float, nargs="+", default=[0.5])
+    parser.add_argument("--tracker", nargs="+", default=["botsort.yaml"])
+    parser.add_argument("--cache-dir", help="Usar la caché de tracks en este directorio")
+    parser.add_argument("--synthetic", type=int, metavar="N",
+                        help="Generar N clips sintéticos con cruces conocidos (offline)")
+    parser.add_argument("--max-age", type=int, default=300,
+                        help="Frames sin ver un track antes de expirarlo (>= track_buffer del tracker)")
+    parser.add_argument("--output-dir", default="results", help="Directorio de salida")
+    args = parser.parse_args()
+
+    if args.annotations is None and not args.synthetic:
+        parser.error("se requiere un archivo de anotaciones o --synthetic N")
+
+    for tracker in args.tracker:
+        try:
+            check_max_age(args.max_age, tracker)
+        except ValueError as e:
+            parser.error(str(e))
+
+    if args.model is None:
+        args.model = ["yolo11n.yaml"] if args.synthetic else ["yolo11n.pt"]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        annotations, cache_dir = args.annotations, args.cache_dir
+        if args.synthetic:
+            annotations, recordings = make_synthetic_fixture(tmp, args.synthetic)
+            error = check_synthetic_fixture(annotations, recordings, Path(tmp) / "track_cache")
+            if error:
+                sys.exit(f"❌ Autocontrol sintético: los tracks reales dan error {error} (se esperaba 0)")
+            print("✅ Autocontrol sintético: los tracks reales dan error 0; "
+                  "la grilla se corre con detección real")
+
+        clips = load_annotations(annotations)
+        df = evaluate(clips, args.model, args.resize, args.tracker, cache_dir=cache_dir, max_age=args.max_age)
+
+    output_dir = Path(args.output_dir) / f"eval_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    output_dir.mkdir(parents=True, exist_ok=True)
+    df.to_csv(output_dir / "evaluacion.csv", index=False)
+
+    print("\n📊 PRECISIÓN VS. RENDIMIENTO (pareto = configuración no dominada)")
+    print(df.to_string(index=False, float_format=lambda x: f"{x:.2f}"))
+    print(f"\n📝 Resultados en: {output_dir / 'evaluacion.csv'}")
+
+
+if __name__ == "__main__":
+    main()
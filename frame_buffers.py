@@ -0,0 +1,45 @@
+import cv2
+import numpy as np
+
+
+class FrameBuffers:
+    """
+    Buffers preasignados para el camino por frame.
+
+    ``cap.read`` decodifica sobre el buffer de entrada, ``cv2.resize`` escribe
+    sobre el buffer de procesamiento y el ObjectCounter dibuja las anotaciones
+    sobre ese mismo arreglo (el Annotator de ultralytics no copia imágenes
+    escribibles). Así el ciclo no reserva arreglos de tamaño completo por frame.
+    """
+
+    def __init__(self, width, height, proc_w, proc_h):
+        self.proc_size = (proc_w, proc_h)
+        self.frame = np.empty((height, width, 3), dtype=np.uint8)
+
+        # Con resize_factor 1.0 se procesa directamente el buffer de entrada
+        if (proc_w, proc_h) == (width, height):
+            self.resized = None
+        else:
+            self.resized = np.empty((proc_h, proc_w, 3), dtype=np.uint8)
+
+    def read(self, cap):
+        """
+        Lee el siguiente frame y lo deja redimensionado en el buffer de
+        procesamiento. Devuelve None al terminar el video.
+        """
+        success, frame = cap.read(self.frame)
+        if not success or frame is None:
+            return None
+
+        # Si el decodificador entrega otra forma (p. ej. video rotado),
+        # OpenCV reasigna una sola vez y se adopta el nuevo arreglo
+        if frame is not self.frame:
+            self.frame = frame
+
+        if self.resized is None:
+            if self.frame.shape[1::-1] == self.proc_size:
+                return self.frame
+            self.resized = np.empty((self.proc_size[1], self.proc_size[0], 3), dtype=np.uint8)
+
+        cv2.resize(self.frame, self.proc_size, dst=self.resized)
+        return self.resized
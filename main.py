@@ -3,7 +3,8 @@ import json
 from datetime import datetime
 from pathlib import Path
 
-from ultralytics import solutions
+from bounded_counter import BoundedObjectCounter
+from frame_buffers import FrameBuffers
 
 # Mapeo de clases COCO
 CLASS_NAMES = {
@@ -53,8 +54,12 @@ except:
 
 print(f"🎥 Codec de salida: {codec_usado}")
 
+# Frames sin ver un track antes de expirarlo del conteo
+# (no puede ser menor que el track_buffer del tracker)
+max_age = 300
+
 # Inicializar ObjectCounter con todas las clases configuradas
-counter = solutions.ObjectCounter(
+counter = BoundedObjectCounter(
     show=True,
     region=region_points,
     model="yolo11n.pt",
@@ -62,7 +67,8 @@ counter = solutions.ObjectCounter(
     tracker="botsort.yaml",
     show_in=True,   # Mostrar conteo de entradas
     show_out=True,  # Mostrar conteo de salidas
-    line_width=2
+    line_width=2,
+    max_age=max_age
 )
 
 # Procesar video (SIN salto de frames para tracking preciso)
@@ -73,10 +79,13 @@ last_results = None  # Guardar el último resultado para extraer conteos
 print(f"\n🎬 Procesando video: {total_frames} frames")
 print(f"⚙️ Configuración: {proc_w}x{proc_h} @ {fps} fps")
 
+# Buffers preasignados: lectura, redimensionado y anotación reutilizan memoria
+buffers = FrameBuffers(w, h, proc_w, proc_h)
+
 while cap.isOpened():
-    success, im0 = cap.read()
+    resized_frame = buffers.read(cap)
 
-    if not success:
+    if resized_frame is None:
         print("\n✅ Video frame is empty or video processing has been successfully completed.")
         break
 
@@ -87,10 +96,8 @@ while cap.isOpened():
         progress = (frame_num / total_frames) * 100
         print(f"📊 Progreso: {progress:.1f}% ({frame_num}/{total_frames} frames)", end='\r')
 
-    # Redimensionar frame para mejor rendimiento
-    resized_frame = cv2.resize(im0, (proc_w, proc_h))
-
     # Realizar detección y conteo en TODOS los frames
+    # (el frame ya viene redimensionado en el buffer de procesamiento)
     results = counter(resized_frame)
     last_results = results  # Guardar último resultado
 
@@ -156,6 +163,7 @@ results_data = {
         "rect_width": rect_width,
         "tracker": "botsort.yaml",
         "modelo": "yolo11n.pt",
+        "max_age": max_age,
         "codec": codec_usado,
         "clases_detectadas": {CLASS_NAMES[c]: c for c in CLASSES_TO_DETECT}
     },
@@ -0,0 +1,249 @@
+import cv2
+import tempfile
+import time
+from datetime import datetime
+
+from bounded_counter import BoundedObjectCounter
+from frame_buffers import FrameBuffers
+from region_counting import build_region, count_tracks
+from track_cache import TrackRecording
+
+# Mapeo de clases COCO
+CLASS_NAMES = {
+    0: "person",
+    1: "bicycle",
+    2: "car",
+    3: "motorcycle",
+    5: "bus",
+    7: "truck"
+}
+
+CLASSES_TO_DETECT = [0, 1, 2, 3, 5, 7]
+
+# Umbrales de detección para el tracking (valores por defecto de ObjectCounter).
+# Se pasan explícitos para que el barrido y la caché usen exactamente los mismos
+TRACK_ARGS = {"conf": 0.25, "iou": 0.7, "max_det": 300, "half": False}
+
+# Frames iniciales excluidos de la medición de rendimiento (calentamiento del modelo)
+WARMUP_FRAMES = 5
+
+def measure_performance(frames, elapsed, warmup_frames):
+    """
+    Resumen de rendimiento del ciclo por frame
+    """
+    return {
+        "frames_medidos": frames,
+        "frames_calentamiento": warmup_frames,
+        "tiempo_s": elapsed,
+        "fps": frames / elapsed if elapsed > 0 else 0.0
+    }
+
+
+def build_results_data(in_count, out_count, classwise_count, configuracion):
+    """
+    Arma el diccionario de resultados a partir de los conteos finales
+    """
+    conteo_por_clase = {}
+
+    for class_id, counts in (classwise_count or {}).items():
+        try:
+            numeric_id = int(class_id)
+            class_name = CLASS_NAMES.get(numeric_id, f"clase_{class_id}")
+        except (ValueError, TypeError):
+            class_name = str(class_id).lower()
+
+        if isinstance(counts, dict):
+            in_class = counts.get('IN', counts.get('in', 0))
+            out_class = counts.get('OUT', counts.get('out', 0))
+            conteo_por_clase[class_name] = {
+                'in': int(in_class),
+                'out': int(out_class),
+                'total': int(in_class) + int(out_class)
+            }
+
+    return {
+        "processing_id": datetime.now().strftime("%Y%m%d_%H%M%S"),
+        "fecha_procesamiento": datetime.now().isoformat(),
+        "conteo_total": {
+            "in_count": int(in_count),
+            "out_count": int(out_count),
+            "total": int(in_count) + int(out_count)
+        },
+        "conteo_por_clase": conteo_por_clase,
+        "configuracion": configuracion
+    }
+
+
+def process_video(
+    video_path,
+    orientation="vertical",
+    resize_factor=0.5,
+    rect_width=20,
+    progress_bar=None,
+    status_text=None,
+    model="yolo11n.pt",
+    tracker="botsort.yaml",
+    track_cache=None,
+    max_age=300
+):
+    """
+    Procesa el video con detección y conteo de objetos.
+
+    Si se pasa un ``TrackCache`` y ya existen tracks para el mismo video,
+    modelo, resize_factor y tracker, el conteo se recalcula desde la caché
+    sin volver a detectar; en ese caso no se genera video (output_path es None).
+
+    ``max_age`` es la cantidad de frames sin ver un track antes de expirarlo
+    del estado de conteo; debe ser al menos el ``track_buffer`` del tracker.
+
+    ``results_data["rendimiento"]`` mide solo el ciclo por frame (sin carga del
+    modelo, hash del video ni los primeros WARMUP_FRAMES frames).
+    """
+    configuracion = {
+        "orientacion": orientation,
+        "resize_factor": resize_factor,
+        "rect_width": rect_width,
+        "modelo": model,
+        "tracker": tracker
+    }
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise Exception("Error al leer el archivo de video")
+
+    w, h, fps = (int(cap.get(x)) for x in (
+        cv2.CAP_PROP_FRAME_WIDTH,
+        cv2.CAP_PROP_FRAME_HEIGHT,
+        cv2.CAP_PROP_FPS
+    ))
+
+    proc_w = int(w * resize_factor)
+    proc_h = int(h * resize_factor)
+
+    # Configurar región según orientación
+    region_points = build_region(orientation, rect_width, proc_w, proc_h)
+
+    # Inicializar contador
+    counter = BoundedObjectCounter(
+        show=False,
+        region=region_points,
+        model=model,
+        classes=CLASSES_TO_DETECT,
+        tracker=tracker,
+        show_in=True,
+        show_out=True,
+        line_width=2,
+        max_age=max_age,
+        **TRACK_ARGS
+    )
+
+    # La clave se calcula con el modelo ya cargado, así se usa el hash de
+    # los pesos reales aunque se hayan descargado en esta misma ejecución
+    cache_key = None
+    if track_cache is not None:
+        cache_key = track_cache.key(
+            video_path, counter.model.ckpt_path or model, resize_factor, tracker, CLASSES_TO_DETECT, TRACK_ARGS
+        )
+        recording = track_cache.get(cache_key)
+        if recording is not None:
+            cap.release()
+            recount_start = time.perf_counter()
+            region_counter = count_tracks(recording, build_region(orientation, rect_width, *recording.proc_size), max_age)
+            recount_time = time.perf_counter() - recount_start
+            configuracion["desde_cache"] = True
+            results_data = build_results_data(
+                region_counter.in_count,
+                region_counter.out_count,
+                region_counter.classwise_count,
+                configuracion
+            )
+            results_data["rendimiento"] = measure_performance(recording.num_frames, recount_time, 0)
+            return None, results_data
+
+    # Crear archivo temporal para salida
+    output_file = tempfile.NamedTemporaryFile(delete=False, suffix='.mp4')
+    output_path = output_file.name
+    output_file.close()
+
+    # Configurar video writer
+    try:
+        video_writer = cv2.VideoWriter(
+            output_path,
+            cv2.VideoWriter_fourcc(*"avc1"),
+            fps,
+            (proc_w, proc_h)
+        )
+        if not video_writer.isOpened():
+            raise Exception("H.264 no disponible")
+    except:
+        video_writer = cv2.VideoWriter(
+            output_path,
+            cv2.VideoWriter_fourcc(*"mp4v"),
+            fps,
+            (proc_w, proc_h)
+        )
+
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    frame_num = 0
+    last_results = None
+
+    # Buffers reutilizados en cada frame (sin reservar memoria por iteración)
+    buffers = FrameBuffers(w, h, proc_w, proc_h)
+
+    # Tracks de esta ejecución, para poder recontar con otra región
+    recording = TrackRecording(counter.names, (proc_w, proc_h)) if cache_key else None
+
+    # El cronómetro se reinicia al terminar el calentamiento
+    loop_start = time.perf_counter()
+    timed_from = 0
+
+    while cap.isOpened():
+        resized_frame = buffers.read(cap)
+        if resized_frame is None:
+            break
+
+        frame_num += 1
+
+        # Actualizar progreso
+        if progress_bar and frame_num % 10 == 0:
+            progress = frame_num / total_frames
+            progress_bar.progress(progress)
+            if status_text:
+                status_text.text(f"Procesando: {frame_num}/{total_frames} frames ({progress*100:.1f}%)")
+
+        # Procesar frame (las anotaciones se dibujan sobre el mismo buffer)
+        results = counter(resized_frame)
+        last_results = results
+
+        if recording is not None:
+            recording.add(frame_num - 1, counter.track_ids, counter.clss, counter.boxes)
+
+        video_writer.write(results.plot_im)
+
+        if frame_num == WARMUP_FRAMES and (total_frames <= 0 or frame_num < total_frames):
+            loop_start = time.perf_counter()
+            timed_from = frame_num
+
+    loop_time = time.perf_counter() - loop_start
+    cap.release()
+    video_writer.release()
+
+    if recording is not None:
+        track_cache.put(cache_key, recording)
+
+    # Extraer conteos por clase
+    if last_results and hasattr(last_results, 'classwise_count') and last_results.classwise_count:
+        classwise_count = last_results.classwise_count
+    else:
+        classwise_count = getattr(counter, 'classwise_count', None)
+
+    # Preparar resultados
+    results_data = build_results_data(
+        getattr(counter, 'in_count', 0),
+        getattr(counter, 'out_count', 0),
+        classwise_count,
+        configuracion
+    )
+    results_data["rendimiento"] = measure_performance(frame_num - timed_from, loop_time, timed_from)
+
+    return output_path, results_data
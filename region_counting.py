@@ -0,0 +1,168 @@
+from collections import OrderedDict, defaultdict, deque
+
+from shapely.geometry import LineString, Point, Polygon
+
+
+def build_region(orientation, rect_width, proc_w, proc_h):
+    """
+    Construye el rectángulo de conteo centrado en el frame procesado
+    """
+    if orientation == "vertical":
+        center_x = int(proc_w / 2)
+        return [
+            (center_x - rect_width, 0),
+            (center_x + rect_width, 0),
+            (center_x + rect_width, proc_h),
+            (center_x - rect_width, proc_h)
+        ]
+
+    # horizontal
+    center_y = int(proc_h / 2)
+    return [
+        (0, center_y - rect_width),
+        (proc_w, center_y - rect_width),
+        (proc_w, center_y + rect_width),
+        (0, center_y + rect_width)
+    ]
+
+
+class CounterState:
+    """
+    Estado de conteo con memoria acotada para ejecuciones continuas largas.
+
+    Cada track guarda solo sus últimas ``history_len`` posiciones (deque de
+    largo fijo), los IDs contados están en un set (búsqueda O(1)) y los tracks
+    que no aparecen durante ``max_age`` frames se eliminan del historial y del
+    set. Los totales se mantienen como contadores simples.
+    """
+
+    def __init__(self, history_len=30, max_age=300):
+        self.history_len = history_len
+        self.max_age = max_age
+        self.frame_idx = -1
+        self.history = {}
+        self.last_seen = OrderedDict()  # track_id -> último frame, del más antiguo al más reciente
+        self.counted_ids = set()
+        self.in_count = 0
+        self.out_count = 0
+        self.classwise_count = defaultdict(lambda: {"IN": 0, "OUT": 0})
+
+    def next_frame(self, frame_idx=None):
+        """
+        Avanza al siguiente frame y elimina los tracks expirados
+        """
+        self.frame_idx = self.frame_idx + 1 if frame_idx is None else frame_idx
+        oldest = self.frame_idx - self.max_age
+        while self.last_seen:
+            track_id, seen = next(iter(self.last_seen.items()))
+            if seen >= oldest:
+                break
+            del self.last_seen[track_id]
+            self.history.pop(track_id, None)
+            self.counted_ids.discard(track_id)
+
+    def observe(self, track_id, centroid):
+        """
+        Registra la posición del track en el frame actual y devuelve su historial
+        """
+        track_line = self.history.get(track_id)
+        if track_line is None:
+            track_line = self.history[track_id] = deque(maxlen=self.history_len)
+        track_line.append(centroid)
+        self.last_seen[track_id] = self.frame_idx
+        self.last_seen.move_to_end(track_id)
+        return track_line
+
+    def record(self, track_id, class_name, direction):
+        """
+        Suma un cruce (IN u OUT) y marca el track como contado
+        """
+        if direction == "IN":
+            self.in_count += 1
+        else:
+            self.out_count += 1
+        self.classwise_count[class_name][direction] += 1
+        self.counted_ids.add(track_id)
+
+
+class RegionCounter:
+    """
+    Conteo IN/OUT sobre tracks ya calculados, con la misma regla que
+    ObjectCounter de ultralytics: un track se cuenta una sola vez, cuando su
+    centroide entra al polígono (o cruza la línea), y la dirección se decide
+    comparando con su posición anterior.
+    """
+
+    def __init__(self, region, names, history_len=30, max_age=300):
+        self.region = region
+        self.names = names
+        self.r_s = Polygon(region) if len(region) >= 3 else LineString(region)
+        self.state = CounterState(history_len, max_age)
+
+        if len(region) >= 3:
+            xs = [p[0] for p in region]
+            ys = [p[1] for p in region]
+            self.vertical = (max(xs) - min(xs)) < (max(ys) - min(ys))
+        else:
+            self.vertical = abs(region[0][0] - region[1][0]) < abs(region[0][1] - region[1][1])
+
+        # Los rectángulos alineados a los ejes (los de build_region) se
+        # resuelven comparando coordenadas, sin crear geometrías por detección
+        self.bounds = None
+        if len(region) == 4 and self.r_s.equals(self.r_s.envelope):
+            self.bounds = self.r_s.bounds
+
+    @property
+    def in_count(self):
+        return self.state.in_count
+
+    @property
+    def out_count(self):
+        return self.state.out_count
+
+    @property
+    def classwise_count(self):
+        return self.state.classwise_count
+
+    def count_crossing(self, track_id, cls, centroid, prev_position):
+        """
+        Cuenta el track si su centroide actual está en la región
+        """
+        if prev_position is None or track_id in self.state.counted_ids:
+            return
+
+        if self.bounds is not None:
+            min_x, min_y, max_x, max_y = self.bounds
+            crossed = min_x < centroid[0] < max_x and min_y < centroid[1] < max_y
+        elif len(self.region) >= 3:
+            crossed = self.r_s.contains(Point(centroid))
+        else:
+            crossed = self.r_s.intersects(LineString([prev_position, centroid]))
+        if not crossed:
+            return
+
+        axis = 0 if self.vertical else 1
+        direction = "IN" if centroid[axis] > prev_position[axis] else "OUT"
+        self.state.record(track_id, self.names[int(cls)], direction)
+
+    def update(self, track_ids, classes, boxes, frame_idx=None):
+        """
+        Actualiza el conteo con las detecciones de un frame (cajas xyxy)
+        """
+        self.state.next_frame(frame_idx)
+        for track_id, cls, box in zip(track_ids, classes, boxes):
+            track_id = int(track_id)
+            centroid = (float(box[0] + box[2]) / 2, float(box[1] + box[3]) / 2)
+            track_line = self.state.observe(track_id, centroid)
+            prev_position = track_line[-2] if len(track_line) > 1 else None
+            self.count_crossing(track_id, cls, centroid, prev_position)
+
+
+def count_tracks(recording, region, max_age=300):
+    """
+    Recalcula el conteo de una grabación de tracks para una región dada
+    """
+    counter = RegionCounter(region, recording.names, max_age=max_age)
+    for frame_idx, track_ids, classes, boxes in recording.iter_frames():
+        counter.update(track_ids, classes, boxes, frame_idx)
+    return counter
@@ -0,0 +1,218 @@
+"""
+Barrido de configuraciones con una sola decodificación del video.
+
+Cada frame se decodifica una vez y se reparte a todas las configuraciones:
+las que comparten resize_factor comparten la detección y el tracking, y cada
+combinación de orientación y ancho de rectángulo lleva su propio conteo.
+Se genera un JSON de resultados por configuración y una tabla comparativa.
+
+Uso:
+    python sweep.py video.mp4 --resize 0.5 0.75 --orientation vertical horizontal --rect-width 20 40
+"""
+import argparse
+import itertools
+import json
+from datetime import datetime
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pandas as pd
+from ultralytics import YOLO
+
+from bounded_counter import check_max_age
+from frame_buffers import FrameBuffers
+from processing import CLASSES_TO_DETECT, TRACK_ARGS, build_results_data
+from region_counting import RegionCounter, build_region
+from track_cache import TrackRecording, open_track_cache
+
+
+def run_sweep(
+    video_path,
+    resize_factors=(0.5,),
+    orientations=("vertical",),
+    rect_widths=(20,),
+    model="yolo11n.pt",
+    tracker="botsort.yaml",
+    track_cache=None,
+    max_age=300
+):
+    """
+    Procesa el video una sola vez para todas las combinaciones de parámetros.
+    Devuelve una lista de diccionarios de resultados (uno por configuración).
+    """
+    check_max_age(max_age, tracker)
+
+    cap = cv2.VideoCapture(str(video_path))
+    if not cap.isOpened():
+        raise Exception("Error al leer el archivo de video")
+
+    w, h = (int(cap.get(x)) for x in (cv2.CAP_PROP_FRAME_WIDTH, cv2.CAP_PROP_FRAME_HEIGHT))
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+
+    # Un pipeline de detección + tracking por resize_factor
+    pipelines = []
+    for resize_factor in dict.fromkeys(resize_factors):
+        proc_w, proc_h = int(w * resize_factor), int(h * resize_factor)
+        detector = YOLO(model)
+        pipeline = {
+            "resize_factor": resize_factor,
+            "proc_size": (proc_w, proc_h),
+            "detector": detector,
+            "buffer": None if (proc_w, proc_h) == (w, h) else np.empty((proc_h, proc_w, 3), dtype=np.uint8),
+            "counters": {},
+            "cache_key": None,
+            "recording": None
+        }
+
+        if track_cache is not None:
+            pipeline["cache_key"] = track_cache.key(
+                video_path, detector.ckpt_path or model, resize_factor, tracker, CLASSES_TO_DETECT, TRACK_ARGS
+            )
+            pipeline["recording"] = TrackRecording(detector.names, (proc_w, proc_h))
+
+        # Un contador de región por cada combinación orientación / ancho
+        for orientation, rect_width in itertools.product(dict.fromkeys(orientations), dict.fromkeys(rect_widths)):
+            region_points = build_region(orientation, rect_width, proc_w, proc_h)
+            pipeline["counters"][(orientation, rect_width)] = RegionCounter(region_points, detector.names, max_age=max_age)
+
+        pipelines.append(pipeline)
+
+    # La decodificación se hace a resolución completa, una sola vez por frame
+    buffers = FrameBuffers(w, h, w, h)
+    frame_num = 0
+
+    print(f"\n🎬 Barrido: {len(pipelines)} resoluciones, "
+          f"{sum(len(p['counters']) for p in pipelines)} configuraciones, {total_frames} frames")
+
+    while cap.isOpened():
+        frame = buffers.read(cap)
+        if frame is None:
+            break
+
+        frame_num += 1
+        if frame_num % 30 == 0 and total_frames:
+            progress = (frame_num / total_frames) * 100
+            print(f"📊 Progreso: {progress:.1f}% ({frame_num}/{total_frames} frames)", end='\r')
+
+        for pipeline in pipelines:
+            proc_frame = frame
+            if pipeline["buffer"] is not None:
+                proc_frame = cv2.resize(frame, pipeline["proc_size"], dst=pipeline["buffer"])
+
+            # Mismos umbrales que process_video (Model.track usaría conf=0.1 por defecto)
+            result = pipeline["detector"].track(
+                source=proc_frame, persist=True, classes=CLASSES_TO_DETECT, tracker=tracker, verbose=False,
+                **TRACK_ARGS
+            )[0]
+            boxes = result.boxes
+            if boxes is not None and boxes.is_track:
+                track_ids = boxes.id.int().cpu().tolist()
+                clss = boxes.cls.cpu().tolist()
+                xyxy = boxes.xyxy.cpu().numpy()
+            else:
+                track_ids, clss, xyxy = [], [], np.empty((0, 4), dtype=np.float32)
+
+            for region_counter in pipeline["counters"].values():
+                region_counter.update(track_ids, clss, xyxy)
+
+            if pipeline["recording"] is not None:
+                pipeline["recording"].add(frame_num - 1, track_ids, clss, xyxy)
+
+    cap.release()
+
+    all_results = []
+    for pipeline in pipelines:
+        if pipeline["recording"] is not None:
+            track_cache.put(pipeline["cache_key"], pipeline["recording"])
+
+        for (orientation, rect_width), region_counter in pipeline["counters"].items():
+            all_results.append(build_results_data(
+                region_counter.in_count,
+                region_counter.out_count,
+                region_counter.classwise_count,
+                {
+                    "orientacion": orientation,
+                    "resize_factor": pipeline["resize_factor"],
+                    "rect_width": rect_width,
+                    "modelo": model,
+                    "tracker": tracker
+                }
+            ))
+
+    return all_results
+
+
+def comparison_table(all_results):
+    """
+    Tabla comparativa: una fila por configuración, con totales y conteo por clase
+    """
+    class_names = sorted({clase for results in all_results for clase in results['conteo_por_clase']})
+
+    rows = []
+    for results in all_results:
+        config = results['configuracion']
+        row = {
+            'resize_factor': config['resize_factor'],
+            'orientacion': config['orientacion'],
+            'rect_width': config['rect_width'],
+            'in': results['conteo_total']['in_count'],
+            'out': results['conteo_total']['out_count'],
+            'total': results['conteo_total']['total']
+        }
+        for clase in class_names:
+            row[clase] = results['conteo_por_clase'].get(clase, {}).get('total', 0)
+        rows.append(row)
+
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("video", help="Video de entrada")
+    parser.add_argument("--resize", type=float, nargs="+", default=[0.5], help="Factores de redimensionamiento")
+    parser.add_argument("--orientation", nargs="+", default=["vertical"], choices=["vertical", "horizontal"])
+    parser.add_argument("--rect-width", type=int, nargs="+", default=[20], help="Anchos del rectángulo (px)")
+    parser.add_argument("--model", default="yolo11n.pt")
+    parser.add_argument("--tracker", default="botsort.yaml")
+    parser.add_argument("--output-dir", default="results", help="Directorio de salida")
+    parser.add_argument("--no-cache", action="store_true", help="No guardar los tracks en la caché")
+    parser.add_argument("--max-age", type=int, default=300,
+                        help="Frames sin ver un track antes de expirarlo (>= track_buffer del tracker)")
+    args = parser.parse_args()
+
+    try:
+        check_max_age(args.max_age, args.tracker)
+    except ValueError as e:
+        parser.error(str(e))
+
+    all_results = run_sweep(
+        args.video,
+        resize_factors=args.resize,
+        orientations=args.orientation,
+        rect_widths=args.rect_width,
+        model=args.model,
+        tracker=args.tracker,
+        track_cache=None if args.no_cache else open_track_cache(),
+        max_age=args.max_age
+    )
+
+    output_dir = Path(args.output_dir) / f"sweep_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    for results in all_results:
+        config = results['configuracion']
+        name = f"results_{config['orientacion']}_w{config['rect_width']}_r{round(config['resize_factor'] * 100)}.json"
+        with open(output_dir / name, 'w') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+    df = comparison_table(all_results)
+    df.to_csv(output_dir / "comparacion.csv", index=False)
+
+    print("\n\n📊 COMPARACIÓN DE CONFIGURACIONES")
+    print(df.to_string(index=False))
+    print(f"\n📝 Resultados en: {output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+import hashlib
+import io
+import json
+import logging
+import os
+import tempfile
+import zipfile
+from pathlib import Path
+
+import numpy as np
+
+# Directorio y tamaño máximo por defecto de la caché de tracks
+DEFAULT_CACHE_DIR = Path(os.environ.get("YOLO_TRACK_CACHE", Path.home() / ".cache" / "yolo_detect" / "tracks"))
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+LOGGER = logging.getLogger(__name__)
+
+
+def file_digest(path, chunk_size=1024 * 1024):
+    """
+    Hash SHA-256 del contenido de un archivo, leído por bloques
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _config_digest(name):
+    """
+    Hash del archivo de modelo/tracker si existe localmente. Los trackers
+    incluidos en ultralytics (botsort.yaml, bytetrack.yaml) se resuelven a su
+    ruta real para que cambios en la configuración invaliden la caché.
+    """
+    path = Path(name)
+    if not path.is_file() and path.suffix in (".yaml", ".yml"):
+        try:
+            from ultralytics.utils.checks import check_yaml
+            path = Path(check_yaml(name))
+        except Exception:
+            return None
+    return file_digest(path) if path.is_file() else None
+
+
+class TrackRecording:
+    """
+    Tracks de una ejecución: por cada detección se guarda el frame, el ID de
+    track, la clase y la caja xyxy en coordenadas del frame procesado.
+    """
+
+    def __init__(self, names, proc_size):
+        self.names = {int(k): v for k, v in names.items()}
+        self.proc_size = tuple(proc_size)
+        self.num_frames = 0
+        self._frames = []
+        self._track_ids = []
+        self._classes = []
+        self._boxes = []
+
+    def add(self, frame_idx, track_ids, classes, boxes):
+        """
+        Agrega las detecciones de un frame
+        """
+        self.num_frames = max(self.num_frames, frame_idx + 1)
+        if not len(track_ids):
+            return
+        self._frames.append(np.full(len(track_ids), frame_idx, dtype=np.int32))
+        self._track_ids.append(np.asarray(track_ids, dtype=np.int32))
+        self._classes.append(np.asarray(classes, dtype=np.int16))
+        self._boxes.append(np.asarray(boxes, dtype=np.float32).reshape(-1, 4))
+
+    def _arrays(self):
+        if not self._frames:
+            return (np.empty(0, np.int32), np.empty(0, np.int32),
+                    np.empty(0, np.int16), np.empty((0, 4), np.float32))
+        if len(self._frames) > 1:
+            self._frames = [np.concatenate(self._frames)]
+            self._track_ids = [np.concatenate(self._track_ids)]
+            self._classes = [np.concatenate(self._classes)]
+            self._boxes = [np.concatenate(self._boxes)]
+        return self._frames[0], self._track_ids[0], self._classes[0], self._boxes[0]
+
+    def iter_frames(self):
+        """
+        Itera (frame, track_ids, clases, cajas) en orden, solo frames con tracks
+        """
+        frames, track_ids, classes, boxes = self._arrays()
+        if not len(frames):
+            return
+        bounds = np.flatnonzero(np.diff(frames)) + 1
+        starts = np.concatenate(([0], bounds))
+        ends = np.concatenate((bounds, [len(frames)]))
+        for start, end in zip(starts, ends):
+            yield int(frames[start]), track_ids[start:end], classes[start:end], boxes[start:end]
+
+    def save(self, f):
+        frames, track_ids, classes, boxes = self._arrays()
+        meta = {"names": self.names, "proc_size": self.proc_size, "num_frames": self.num_frames}
+        np.savez_compressed(
+            f, frames=frames, track_ids=track_ids, classes=classes, boxes=boxes,
+            meta=np.array(json.dumps(meta))
+        )
+
+    @classmethod
+    def load(cls, f):
+        with np.load(f) as data:
+            meta = json.loads(str(data["meta"]))
+            recording = cls(meta["names"], meta["proc_size"])
+            recording.num_frames = meta["num_frames"]
+            recording._frames = [data["frames"]]
+            recording._track_ids = [data["track_ids"]]
+            recording._classes = [data["classes"]]
+            recording._boxes = [data["boxes"]]
+        return recording
+
+
+class TrackCache:
+    """
+    Caché en disco de grabaciones de tracks con desalojo LRU por tamaño.
+    El orden LRU se lleva con la fecha de modificación de cada archivo.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def key(self, video_path, model, resize_factor, tracker, classes, track_args=None):
+        """
+        Clave por contenido del video más la configuración que afecta a los tracks.
+        ``model`` debe ser la ruta resuelta de los pesos (``model.ckpt_path``)
+        para que el hash corresponda al archivo realmente usado, y
+        ``track_args`` los umbrales de detección (conf, iou, max_det, half).
+        """
+        config = {
+            "video": file_digest(video_path),
+            "model": Path(str(model)).name,
+            "model_digest": _config_digest(model),
+            "resize_factor": float(resize_factor),
+            "tracker": str(tracker),
+            "tracker_digest": _config_digest(tracker),
+            "classes": sorted(classes) if classes is not None else None,
+            "track_args": track_args,
+        }
+        return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()
+
+    def _path(self, key):
+        return self.cache_dir / f"{key}.npz"
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            if not path.is_file():
+                return None
+            recording = TrackRecording.load(path)
+        except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+            # Entrada ilegible, truncada o corrupta: se descarta como si no existiera
+            try:
+                path.unlink(missing_ok=True)
+            except OSError:
+                pass
+            return None
+        try:
+            os.utime(path)  # marcar como usado recientemente
+        except OSError:
+            pass
+        return recording
+
+    def put(self, key, recording):
+        """
+        Guarda la grabación. La caché es best-effort: un error de disco
+        (sin espacio, sin permisos) se registra y devuelve False sin
+        interrumpir el procesamiento.
+        """
+        buffer = io.BytesIO()
+        recording.save(buffer)
+
+        tmp_path = None
+        try:
+            # Archivo temporal propio por escritor: varias sesiones pueden guardar la misma clave
+            with tempfile.NamedTemporaryFile(dir=self.cache_dir, suffix=".tmp", delete=False) as tmp_file:
+                tmp_path = tmp_file.name
+                tmp_file.write(buffer.getvalue())
+            os.replace(tmp_path, self._path(key))
+            self.evict()
+        except OSError as e:
+            LOGGER.warning(f"No se pudo guardar en la caché de tracks ({self.cache_dir}): {e}")
+            if tmp_path:
+                try:
+                    Path(tmp_path).unlink(missing_ok=True)
+                except OSError:
+                    pass
+            return False
+        return True
+
+    def evict(self):
+        """
+        Elimina las entradas menos usadas hasta respetar max_bytes
+        """
+        entries = []
+        for path in self.cache_dir.glob("*.npz"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+def open_track_cache(cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Abre la caché de tracks o devuelve None si el directorio no se puede
+    crear (p. ej. sin permisos de escritura); el procesamiento sigue sin caché.
+    """
+    try:
+        return TrackCache(cache_dir, max_bytes)
+    except OSError as e:
+        LOGGER.warning(f"Caché de tracks deshabilitada ({cache_dir}): {e}")
+        return None